@@ -0,0 +1,224 @@
+"""동기/CPU 집약 도구를 이벤트 루프 밖에서 실행하기 위한 헬퍼.
+
+FastMCP는 `def`로 정의된 동기 도구를 이벤트 루프 스레드에서 그대로 호출합니다.
+도구가 무거운 계산이나 블로킹 I/O를 수행하면 같은 프로세스의 다른 세션 스트림까지
+모두 멈추게 되므로, 도구마다 실행 정책을 지정할 수 있도록 합니다.
+
+- "inline": 기존과 동일하게 이벤트 루프에서 바로 실행 (가벼운 도구용)
+- "thread": 스레드 풀에서 실행 (블로킹 I/O 도구용)
+- "process": 프로세스 풀에서 실행 (CPU 집약 도구용, GIL 회피)
+
+사용 예:
+
+    @mcp.tool()
+    @offload("process", timeout=5)
+    def heavy(n: int) -> int:
+        ...
+
+풀 크기는 `configure()` 또는 환경 변수 `MCP_THREAD_WORKERS`,
+`MCP_PROCESS_WORKERS`로 지정합니다.
+"""
+
+import asyncio
+import functools
+import importlib.util
+import inspect
+import multiprocessing
+import os
+import sys
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+INLINE = "inline"
+THREAD = "thread"
+PROCESS = "process"
+
+_POLICIES = (INLINE, THREAD, PROCESS)
+
+# 풀 크기 설정 (None이면 concurrent.futures와 같은 기본값 사용)
+_pool_sizes = {
+    THREAD: int(os.environ["MCP_THREAD_WORKERS"]) if os.environ.get("MCP_THREAD_WORKERS") else None,
+    PROCESS: int(os.environ["MCP_PROCESS_WORKERS"]) if os.environ.get("MCP_PROCESS_WORKERS") else None,
+}
+# 풀은 첫 호출 시점에 생성합니다 (서버 import만으로 프로세스가 뜨지 않도록)
+_pools: dict[str, "Executor | _ProcessPool"] = {}
+
+
+def configure(thread_workers: int | None = None, process_workers: int | None = None) -> None:
+    """스레드/프로세스 풀 크기를 설정합니다.
+
+    이미 생성된 풀은 종료하고, 다음 도구 호출 시 새 크기로 다시 생성합니다.
+    """
+    shutdown()
+    _pool_sizes[THREAD] = thread_workers
+    _pool_sizes[PROCESS] = process_workers
+
+
+def shutdown() -> None:
+    """생성된 풀을 모두 종료합니다."""
+    for pool in _pools.values():
+        pool.shutdown(wait=False, cancel_futures=True)
+    _pools.clear()
+
+
+def _get_pool(policy: str) -> "Executor | _ProcessPool":
+    pool = _pools.get(policy)
+    if pool is None:
+        if policy == THREAD:
+            pool = ThreadPoolExecutor(max_workers=_pool_sizes[THREAD], thread_name_prefix="mcp-tool")
+        else:
+            pool = _ProcessPool(max_workers=_pool_sizes[PROCESS])
+        _pools[policy] = pool
+    return pool
+
+
+class _WorkerExited(Exception):
+    """작업 도중 워커 프로세스가 종료되어 파이프가 닫혔습니다."""
+
+
+class _Worker:
+    """작업을 하나씩 받아 실행하는 프로세스 워커."""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def call(self, job: tuple):
+        """작업을 보내고 결과를 기다립니다. (대기 스레드에서 실행)"""
+        try:
+            self.conn.send(job)
+            return self.conn.recv()
+        except (EOFError, OSError):
+            self.conn.close()
+            raise _WorkerExited from None
+
+    def kill(self) -> None:
+        # 프로세스가 종료되면 파이프가 닫혀 recv()로 기다리던 스레드도 풀려남
+        self.process.terminate()
+
+
+class _ProcessPool:
+    """워커를 하나씩 교체할 수 있는 프로세스 풀.
+
+    `ProcessPoolExecutor`는 실행 중인 작업 하나만 중단할 수 없어, 시간 초과된 작업을
+    멈추려면 풀 전체를 종료해야 합니다. 이 풀은 시간 초과(또는 취소)된 작업을 실행하던
+    워커만 종료하고, 다음 작업이 필요할 때 새 워커를 띄웁니다. 다른 호출은 영향을 받지 않습니다.
+    """
+
+    def __init__(self, max_workers: int | None = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # 서버 프로세스에는 stdio/이벤트 루프 스레드가 떠 있어 fork하면 워커가 멈출 수 있으므로 spawn 사용
+        self._context = multiprocessing.get_context("spawn")
+        self._slots = asyncio.Semaphore(self.max_workers)
+        self._idle: list[_Worker] = []
+        self._busy: set[_Worker] = set()
+        # 워커 결과를 기다리는 스레드 (종료된 워커의 스레드가 풀려나는 동안 여유분 포함)
+        self._waiters = ThreadPoolExecutor(max_workers=self.max_workers * 2, thread_name_prefix="mcp-worker-wait")
+
+    async def run(self, job: tuple, timeout: float | None):
+        async with self._slots:
+            worker = self._idle.pop() if self._idle else _Worker(self._context)
+            self._busy.add(worker)
+            call = asyncio.get_running_loop().run_in_executor(self._waiters, worker.call, job)
+            try:
+                ok, value = await asyncio.wait_for(call, timeout)
+            except _WorkerExited:
+                raise RuntimeError("도구를 실행하던 워커 프로세스가 비정상 종료되었습니다") from None
+            except BaseException:
+                # 시간 초과/취소: 이 작업을 실행 중인 워커만 종료
+                worker.kill()
+                raise
+            finally:
+                self._busy.discard(worker)
+            self._idle.append(worker)
+        if not ok:
+            raise value
+        return value
+
+    def shutdown(self, wait: bool = False, cancel_futures: bool = True) -> None:
+        for worker in self._idle + list(self._busy):
+            worker.kill()
+        self._idle.clear()
+        self._waiters.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+def _worker_main(conn) -> None:
+    """워커 프로세스: 작업을 받아 실행하고 (성공 여부, 결과 또는 예외)를 돌려줍니다."""
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            result = (True, _call_in_worker(*job))
+        except Exception as e:
+            result = (False, e)
+        try:
+            conn.send(result)
+        except Exception as e:
+            # 결과나 예외를 pickle할 수 없는 경우
+            conn.send((False, RuntimeError(f"도구 결과를 전달할 수 없습니다: {e!r}")))
+
+
+def _call_in_worker(module_name: str, module_file: str, qualname: str, args: tuple, kwargs: dict):
+    """프로세스 워커에서 원래 도구 함수를 찾아 실행합니다.
+
+    `mcp run server.py`처럼 서버 파일이 임의의 모듈 이름으로 로드되면 워커는
+    그 모듈을 import할 수 없으므로, 처음 한 번 파일 경로로 직접 로드해 캐시합니다.
+    """
+    module = sys.modules.get(module_name)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(module_name, module_file)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+    target = module
+    for part in qualname.split("."):
+        target = getattr(target, part)
+    return target(*args, **kwargs)
+
+
+def offload(policy: str = THREAD, *, timeout: float | None = None):
+    """동기 도구 함수의 실행 정책을 지정하는 데코레이터.
+
+    `@mcp.tool()` 바로 아래에 사용합니다. 감싼 함수는 async 함수가 되지만
+    `functools.wraps` 덕분에 FastMCP가 원래 함수의 시그니처로 입력 스키마를 만듭니다.
+
+    Args:
+        policy: "inline", "thread", "process" 중 하나
+        timeout: 도구 호출 제한 시간(초). 초과하면 TimeoutError를 발생시킵니다.
+            "process"는 해당 작업을 실행하던 워커 프로세스만 종료해 자원을 회수하지만,
+            "thread"는 실행 중인 스레드를 중단할 수 없어 작업이 끝날 때까지 워커를 차지합니다.
+            "inline"에는 지정할 수 없습니다.
+    """
+    if policy not in _POLICIES:
+        raise ValueError(f"Unknown execution policy: {policy}")
+    if policy == INLINE and timeout is not None:
+        raise ValueError("inline 정책은 이벤트 루프에서 실행되므로 timeout을 지정할 수 없습니다")
+
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            raise TypeError(f"{fn.__name__}: offload는 동기(def) 도구에만 사용할 수 있습니다")
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            if policy == INLINE:
+                return fn(*args, **kwargs)
+            try:
+                if policy == PROCESS:
+                    # 프로세스 워커에는 함수 객체 대신 (모듈, qualname) 참조와 인수만 pickle되어 전달됩니다
+                    return await _get_pool(PROCESS).run((*target, args, kwargs), timeout)
+                call = asyncio.get_running_loop().run_in_executor(
+                    _get_pool(THREAD), functools.partial(fn, *args, **kwargs)
+                )
+                return await asyncio.wait_for(call, timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Tool '{fn.__name__}' timed out after {timeout}s") from None
+
+        # 모듈에서 `fn.__name__` 이름은 wrapper가 차지하므로, 워커에서는
+        # `<이름>.__wrapped__` 경로로 원래 함수를 찾습니다.
+        target = (fn.__module__, inspect.getfile(fn), f"{fn.__qualname__}.__wrapped__")
+        return wrapper
+
+    return decorator
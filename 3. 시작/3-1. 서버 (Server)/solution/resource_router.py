@@ -0,0 +1,253 @@
+"""리소스 템플릿이 많아져도 URI 조회가 느려지지 않도록 하는 라우터.
+
+FastMCP는 리소스를 읽을 때 등록된 템플릿을 하나씩 정규식으로 비교하므로 템플릿 수에
+비례해 느려지고, `resources/list`와 `resources/templates/list`는 페이지 없이 전체 목록을
+한 번에 만들어 보냅니다. `RoutedFastMCP`는 다음과 같이 동작합니다.
+
+- 템플릿을 스킴과 `/`로 나눈 경로 세그먼트 기준의 트라이(trie)에 색인합니다.
+  - 리터럴 세그먼트는 dict로 바로 찾아갑니다.
+  - 매개변수가 있는 세그먼트(`{name}`, `{id}.json` 등)는 등록할 때 정규식을 미리 컴파일해 둡니다.
+  - 조회 시간은 템플릿 수가 아니라 URI 세그먼트 수에 비례합니다.
+- 리터럴 세그먼트가 매개변수 세그먼트보다 먼저 일치합니다. 예를 들어 `users://me`는
+  `users://{id}`보다 우선합니다.
+- 두 목록 요청은 커서 기반으로 `page_size`개씩 나눠 응답합니다.
+
+사용 예:
+
+    mcp = RoutedFastMCP("Demo", page_size=100)
+
+    @mcp.resource("greeting://{name}")
+    def get_greeting(name: str) -> str:
+        ...
+"""
+
+import re
+from typing import Any
+
+from mcp import types
+from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp.resources import ResourceManager, ResourceTemplate
+from mcp.server.fastmcp.utilities.logging import get_logger
+
+logger = get_logger(__name__)
+
+# FastMCP와 같은 매개변수 표기 ({이름})
+_PARAM_RE = re.compile(r"{(\w+)}")
+
+DEFAULT_PAGE_SIZE = 100
+
+
+def split_uri(uri: str) -> tuple[str, list[str]]:
+    """URI를 (스킴, 경로 세그먼트 목록)으로 나눕니다."""
+    scheme, sep, rest = uri.partition("://")
+    if not sep:
+        return "", uri.split("/")
+    return scheme, rest.split("/")
+
+
+class _SegmentMatcher:
+    """매개변수가 있는 세그먼트 하나의 컴파일된 추출기."""
+
+    __slots__ = ("regex",)
+
+    def __init__(self, shape: str):
+        # 이름을 뺀 모양("{}.json")으로 만들어, 모양이 같은 템플릿끼리 노드를 공유
+        parts = shape.split("{}")
+        self.regex = re.compile("([^/]+)".join(re.escape(p) for p in parts))
+
+    def match(self, segment: str) -> tuple[str, ...] | None:
+        m = self.regex.fullmatch(segment)
+        return m.groups() if m else None
+
+
+class _Node:
+    __slots__ = ("literals", "params", "template")
+
+    def __init__(self):
+        self.literals: dict[str, _Node] = {}
+        self.params: dict[str, tuple[_SegmentMatcher, _Node]] = {}  # 세그먼트 모양 -> (추출기, 노드)
+        self.template: tuple[ResourceTemplate, list[str]] | None = None  # (템플릿, 매개변수 이름 순서)
+
+
+class TemplateRouter:
+    """스킴과 경로 세그먼트로 색인한 리소스 템플릿 트라이."""
+
+    def __init__(self):
+        self._roots: dict[str, _Node] = {}
+
+    def add(self, template: ResourceTemplate) -> ResourceTemplate | None:
+        """템플릿을 색인합니다. 같은 모양의 템플릿이 있었다면 교체하고 이전 템플릿을 반환합니다."""
+        scheme, segments = split_uri(template.uri_template)
+        node = self._roots.setdefault(scheme, _Node())
+        names: list[str] = []
+        for segment in segments:
+            segment_names = _PARAM_RE.findall(segment)
+            if not segment_names:
+                node = node.literals.setdefault(segment, _Node())
+                continue
+            names.extend(segment_names)
+            shape = _PARAM_RE.sub("{}", segment)
+            if shape not in node.params:
+                node.params[shape] = (_SegmentMatcher(shape), _Node())
+            node = node.params[shape][1]
+        previous = node.template[0] if node.template else None
+        node.template = (template, names)
+        return previous
+
+    def resolve(self, uri: str) -> tuple[ResourceTemplate, dict[str, Any]] | None:
+        """URI와 일치하는 템플릿과 추출한 매개변수를 반환합니다."""
+        scheme, segments = split_uri(uri)
+        root = self._roots.get(scheme)
+        if root is None:
+            return None
+        found = self._resolve(root, segments, 0, [])
+        if found is None:
+            return None
+        (template, names), values = found
+        return template, dict(zip(names, values))
+
+    def _resolve(self, node: _Node, segments: list[str], index: int, values: list[str]):
+        if index == len(segments):
+            return (node.template, values) if node.template else None
+        segment = segments[index]
+        child = node.literals.get(segment)
+        if child is not None:
+            found = self._resolve(child, segments, index + 1, values)
+            if found is not None:
+                return found
+        for matcher, child in node.params.values():
+            groups = matcher.match(segment)
+            if groups is None:
+                continue
+            found = self._resolve(child, segments, index + 1, values + list(groups))
+            if found is not None:
+                return found
+        return None
+
+
+class RoutedResourceManager(ResourceManager):
+    """템플릿 조회에 `TemplateRouter`를 쓰고, 목록을 페이지 단위로 제공하는 ResourceManager."""
+
+    def __init__(self, warn_on_duplicate_resources: bool = True, page_size: int = DEFAULT_PAGE_SIZE):
+        super().__init__(warn_on_duplicate_resources=warn_on_duplicate_resources)
+        self.page_size = page_size
+        self._router = TemplateRouter()
+        # 페이지를 전체 목록 없이 잘라내기 위한 등록 순서 (dict는 위치로 접근할 수 없음)
+        self._resource_order: list[str] = []
+        self._template_order: list[str] = []
+
+    def add_resource(self, resource):
+        uri = str(resource.uri)
+        if uri not in self._resources:
+            self._resource_order.append(uri)
+        return super().add_resource(resource)
+
+    def add_template(self, fn, uri_template, **kwargs) -> ResourceTemplate:
+        known = uri_template in self._templates
+        template = super().add_template(fn, uri_template, **kwargs)
+        previous = self._router.add(template)
+        if previous is not None and previous.uri_template != template.uri_template:
+            # 매개변수 이름만 다른 템플릿은 같은 URI와 일치하므로 나중에 등록한 것으로 교체
+            logger.warning(f"Resource template {previous.uri_template} replaced by {template.uri_template}")
+            del self._templates[previous.uri_template]
+            self._template_order.remove(previous.uri_template)
+        if not known:
+            self._template_order.append(template.uri_template)
+        return template
+
+    async def get_resource(self, uri, context=None):
+        """Get resource by URI, checking concrete resources first, then templates."""
+        uri_str = str(uri)
+        if resource := self._resources.get(uri_str):
+            return resource
+
+        if found := self._router.resolve(uri_str):
+            template, params = found
+            try:
+                return await template.create_resource(uri_str, params, context=context)
+            except Exception as e:
+                raise ValueError(f"Error creating resource from template: {e}")
+
+        raise ValueError(f"Unknown resource: {uri}")
+
+    def resources_page(self, cursor: str | None) -> tuple[list, str | None]:
+        """커서 위치부터 한 페이지의 리소스와 다음 커서를 반환합니다."""
+        keys, next_cursor = self._page(self._resource_order, cursor)
+        return [self._resources[key] for key in keys], next_cursor
+
+    def templates_page(self, cursor: str | None) -> tuple[list[ResourceTemplate], str | None]:
+        """커서 위치부터 한 페이지의 리소스 템플릿과 다음 커서를 반환합니다."""
+        keys, next_cursor = self._page(self._template_order, cursor)
+        return [self._templates[key] for key in keys], next_cursor
+
+    def _page(self, order: list[str], cursor: str | None) -> tuple[list[str], str | None]:
+        start = _decode_cursor(cursor)
+        end = start + self.page_size
+        return order[start:end], (str(end) if end < len(order) else None)
+
+
+def _decode_cursor(cursor: str | None) -> int:
+    if not cursor:
+        return 0
+    if not cursor.isdigit():
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return int(cursor)
+
+
+class RoutedFastMCP(FastMCP):
+    """리소스 템플릿 라우터와 페이지 단위 목록 응답을 사용하는 FastMCP."""
+
+    def __init__(self, *args, page_size: int = DEFAULT_PAGE_SIZE, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._resource_manager = RoutedResourceManager(
+            warn_on_duplicate_resources=self.settings.warn_on_duplicate_resources,
+            page_size=page_size,
+        )
+        # 저수준 서버의 목록 핸들러를 커서를 받는 핸들러로 교체
+        handlers = self._mcp_server.request_handlers
+        handlers[types.ListResourcesRequest] = self._list_resources_page
+        handlers[types.ListResourceTemplatesRequest] = self._list_resource_templates_page
+
+    async def _list_resources_page(self, request: types.ListResourcesRequest) -> types.ServerResult:
+        cursor = request.params.cursor if request.params else None
+        resources, next_cursor = self._resource_manager.resources_page(cursor)
+        return types.ServerResult(
+            types.ListResourcesResult(
+                resources=[
+                    types.Resource(
+                        uri=resource.uri,
+                        name=resource.name or "",
+                        title=resource.title,
+                        description=resource.description,
+                        mimeType=resource.mime_type,
+                        icons=resource.icons,
+                        annotations=resource.annotations,
+                        _meta=resource.meta,
+                    )
+                    for resource in resources
+                ],
+                nextCursor=next_cursor,
+            )
+        )
+
+    async def _list_resource_templates_page(self, request: types.ListResourceTemplatesRequest) -> types.ServerResult:
+        cursor = request.params.cursor if request.params else None
+        templates, next_cursor = self._resource_manager.templates_page(cursor)
+        return types.ServerResult(
+            types.ListResourceTemplatesResult(
+                resourceTemplates=[
+                    types.ResourceTemplate(
+                        uriTemplate=template.uri_template,
+                        name=template.name,
+                        title=template.title,
+                        description=template.description,
+                        mimeType=template.mime_type,
+                        icons=template.icons,
+                        annotations=template.annotations,
+                        _meta=template.meta,
+                    )
+                    for template in templates
+                ],
+                nextCursor=next_cursor,
+            )
+        )
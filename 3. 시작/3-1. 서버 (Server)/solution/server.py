@@ -1,13 +1,14 @@
 # server.py
-from mcp.server.fastmcp import FastMCP
+from executor import offload
+from resource_router import RoutedFastMCP
 
 """간단한 MCP 서버 예제.
 
-덧셈/뺄셈 도구와 이름 기반 인사 리소스를 제공합니다.
+덧셈/뺄셈 도구, 프로세스 풀에서 실행되는 소수 계산 도구와 이름 기반 인사 리소스를 제공합니다.
 """
 
-# MCP 서버 인스턴스 생성
-mcp = FastMCP("Demo")
+# MCP 서버 인스턴스 생성 (리소스 템플릿이 많아도 조회가 느려지지 않는 라우터 사용)
+mcp = RoutedFastMCP("Demo")
 
 
 # 덧셈 도구 추가
@@ -20,6 +21,20 @@ def subtract(a: int, b: int) -> int:
     """두 숫자의 차이를 계산합니다."""
     return a - b
 
+# CPU 집약 도구는 프로세스 풀에서 실행해 이벤트 루프(다른 세션)를 막지 않도록 합니다
+@mcp.tool()
+@offload("process", timeout=10)
+def count_primes(limit: int) -> int:
+    """limit 이하의 소수 개수를 계산합니다."""
+    if limit < 2:
+        return 0
+    sieve = bytearray([1]) * (limit + 1)
+    sieve[0] = sieve[1] = 0
+    for i in range(2, int(limit**0.5) + 1):
+        if sieve[i]:
+            sieve[i * i :: i] = bytearray(len(sieve[i * i :: i]))
+    return sum(sieve)
+
 # 동적 인사말 리소스 추가
 @mcp.resource("greeting://{name}")
 def get_greeting(name: str) -> str:
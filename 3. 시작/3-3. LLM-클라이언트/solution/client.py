@@ -8,6 +8,9 @@ from azure.ai.inference.models import SystemMessage, UserMessage
 from azure.core.credentials import AzureKeyCredential
 import json
 
+# 질문과 관련된 도구만 골라 LLM에게 전달하기 위한 로컬 색인
+from tool_index import ToolIndex
+
 # stdio 연결에 사용할 서버 파라미터 생성
 server_params = StdioServerParameters(
     command="mcp",  # 실행할 명령어
@@ -15,6 +18,10 @@ server_params = StdioServerParameters(
     env=None,  # 선택적 환경 변수
 )
 
+# 질문마다 LLM에게 전달할 최대 도구 수
+TOOL_TOP_K = int(os.environ.get("TOOL_TOP_K", "8"))
+tool_index = ToolIndex()
+
 def call_llm(prompt, functions):
     token = os.environ["GITHUB_TOKEN"]
     endpoint = "https://models.inference.ai.azure.com"
@@ -102,6 +109,10 @@ async def run():
             
             prompt = "20에 2를 더해줘"
 
+            # 질문과 관련된 도구만 골라서 전달
+            tool_index.update(functions)
+            functions = tool_index.search(prompt, TOOL_TOP_K)
+
             # LLM에게 어떤 도구를 호출할지(필요하다면) 묻기
             functions_to_call = call_llm(prompt, functions)
 
@@ -4,21 +4,30 @@
 1. MCP 서버(server.py)에 연결
 2. 서버로부터 사용 가능한 도구(tools) 목록 가져오기
 3. 사용자 질문을 Azure AI LLM에게 전달 (도구 정보 포함)
-4. LLM이 필요한 도구를 선택하고 매개변수 결정
-5. 선택된 도구를 MCP 서버에서 실행
-6. 결과 출력
+4. LLM이 필요한 도구를 선택하고 매개변수 결정 (스트리밍)
+5. 인수가 완성된 도구부터 MCP 서버에서 바로 실행
+6. 도구 결과를 LLM에게 돌려주고 최종 답변이 나올 때까지 3~5 반복
+7. 결과 출력
 """
 
+import asyncio
+
 from mcp import ClientSession, StdioServerParameters, types
 from mcp.client.stdio import stdio_client
 
 # LLM 관련 라이브러리 임포트
 import os
-from azure.ai.inference import ChatCompletionsClient
+# 스트리밍 응답을 받는 동안에도 도구 실행이 진행되도록 비동기 클라이언트 사용
+from azure.ai.inference.aio import ChatCompletionsClient
 from azure.ai.inference.models import SystemMessage, UserMessage
 from azure.core.credentials import AzureKeyCredential
 import json
 
+# 반복되는 질문의 도구 호출 계획을 재사용하기 위한 캐시
+from plan_cache import PlanCache
+# 질문과 관련된 도구만 골라 LLM에게 전달하기 위한 로컬 색인
+from tool_index import ToolIndex
+
 # ========== 1단계: MCP 서버 연결 설정 ==========
 # stdio 연결에 사용할 서버 파라미터 생성
 # MCP 서버를 subprocess로 실행하고 stdin/stdout으로 통신
@@ -28,17 +37,24 @@ server_params = StdioServerParameters(
     env=None,  # 선택적 환경 변수
 )
 
+# 도구 호출 계획 캐시 (PLAN_CACHE_PATH를 지정하면 sqlite 파일에도 저장되어 재실행 시 재사용)
+plan_cache = PlanCache(
+    maxsize=int(os.environ.get("PLAN_CACHE_SIZE", "256")),
+    ttl=float(os.environ.get("PLAN_CACHE_TTL", "3600")),
+    path=os.environ.get("PLAN_CACHE_PATH"),
+)
+
+# 도구 색인 (질문마다 관련도가 높은 상위 TOOL_TOP_K개의 도구만 LLM에게 전달)
+tool_index = ToolIndex()
+TOOL_TOP_K = int(os.environ.get("TOOL_TOP_K", "8"))
+
+# 에이전트 루프 설정: 최대 LLM 호출 횟수(턴)와 전체 토큰 예산
+MAX_TURNS = int(os.environ.get("AGENT_MAX_TURNS", "5"))
+TOKEN_BUDGET = int(os.environ.get("AGENT_TOKEN_BUDGET", "4000"))
+
 # ========== 3단계: Azure AI LLM 호출 ==========
-def call_llm(prompt, functions):
-    """사용자 질문과 사용 가능한 도구 목록을 LLM에게 전달
-    
-    Args:
-        prompt: 사용자 질문 (예: "20에 2를 더해줘")
-        functions: MCP 서버에서 제공하는 도구 목록 (JSON 스키마 형식)
-        
-    Returns:
-        LLM이 선택한 도구 호출 목록 [{ "name": "add", "args": {"a": 20, "b": 2} }]
-    """
+def create_llm_client():
+    """Azure AI 비동기 클라이언트와 모델 이름을 반환 (설정이 없으면 클라이언트는 None)"""
     # Azure AI Foundry 설정
     # Azure AI Studio > Project > Management > Endpoints 에서 확인 가능
     # 예: https://<your-resource-name>.services.ai.azure.com/models
@@ -51,56 +67,199 @@ def call_llm(prompt, functions):
     if not endpoint or not key:
         print("경고: AZURE_INFERENCE_ENDPOINT 또는 AZURE_INFERENCE_CREDENTIAL 환경 변수가 설정되지 않았습니다.")
         # 테스트를 위해 기존 GitHub Models 설정으로 폴백(Fallback)하거나 에러를 발생시킬 수 있습니다.
-        # 여기서는 에러를 방지하기 위해 예시 값을 넣거나 리턴합니다.
-        return []
+        # 여기서는 에러를 방지하기 위해 None을 리턴합니다.
+        return None, model_name
 
     client = ChatCompletionsClient(
         endpoint=endpoint,
         credential=AzureKeyCredential(key),
     )
+    return client, model_name
+
+def dispatch_tool_call(session, call):
+    """인수가 모두 도착한 도구 호출을 MCP 서버에서 백그라운드로 실행 시작"""
+    print(f"\n  실행 시작: {call['name']}({call['arguments']})")
+    try:
+        args = json.loads(call["arguments"] or "{}")
+    except json.JSONDecodeError as e:
+        # 실행하지 않고 오류 메시지를 결과로 LLM에게 돌려줌
+        call["task"] = asyncio.get_running_loop().create_future()
+        call["task"].set_result(f"잘못된 도구 인수: {e}")
+        return
+    call["args"] = args
+    call["task"] = asyncio.create_task(session.call_tool(call["name"], arguments=args))
+
+async def cancel_tool_calls(calls):
+    """이미 실행을 시작한 도구 호출을 취소하고 모두 끝날 때까지 기다림"""
+    tasks = [c["task"] for c in calls if c["task"] is not None]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+async def stream_llm_turn(client, model_name, messages, functions, session, max_tokens):
+    """LLM 응답을 스트리밍으로 받으면서, 인수가 완성된 도구 호출부터 바로 실행
+
+    Returns:
+        (응답 텍스트, 도구 호출 목록, 사용한 토큰 수)
+        도구 호출: { "id", "name", "arguments", "task" }
+    """
+    response = await client.complete(
+        stream=True,
+        messages=messages,
+        model=model_name,
+        tools=functions,  # 중요! MCP 서버의 도구 목록을 LLM에게 알려줌
+        # 선택적 매개변수
+        temperature=1.0,
+        max_tokens=max_tokens,
+        top_p=1.0,
+        model_extras={"stream_options": {"include_usage": True}},
+    )
+
+    content = ""
+    calls = []  # 스트림에 등장한 순서대로 누적
+    usage = None
+
+    try:
+        async for update in response:
+            if update.usage:
+                usage = update.usage
+            if not update.choices:
+                continue
+            delta = update.choices[0].delta
+            if delta.content:
+                content += delta.content
+                print(delta.content, end="", flush=True)
+            for tool_call in delta.tool_calls or []:
+                # index가 있으면 그 위치의 호출 (건너뛰거나 순서가 바뀌어 와도 해당 위치까지 목록을 늘림),
+                # 없으면 새 id가 올 때만 새 호출이고 아니면 이전 호출의 이어지는 인수 조각
+                index = tool_call.get("index")
+                if index is not None:
+                    while len(calls) <= index:
+                        calls.append({"id": None, "name": "", "arguments": "", "task": None})
+                    call = calls[index]
+                else:
+                    if not calls or bool(tool_call.id) and tool_call.id != calls[-1]["id"]:
+                        calls.append({"id": tool_call.id, "name": "", "arguments": "", "task": None})
+                    call = calls[-1]
+                if tool_call.id and not call["id"]:
+                    call["id"] = tool_call.id
+                if tool_call.function.name:
+                    call["name"] += tool_call.function.name
+                call["arguments"] += tool_call.function.arguments or ""
+                # JSON 객체가 완성되는 즉시 실행 (완성된 JSON은 더 길어질 수 없음)
+                if call["task"] is None and call["name"] and call["arguments"].rstrip().endswith("}"):
+                    try:
+                        json.loads(call["arguments"])
+                    except json.JSONDecodeError:
+                        continue
+                    dispatch_tool_call(session, call)
+    except BaseException:
+        # 스트림이 중간에 끊기면 이미 시작한 도구 호출이 방치되지 않도록 정리
+        await cancel_tool_calls(calls)
+        raise
+
+    # 건너뛴 index로 생긴 빈 자리는 제외
+    calls = [c for c in calls if c["name"]]
+    # 스트림이 끝났는데 아직 실행하지 않은 호출 (예: 인수가 없는 도구)
+    for call in calls:
+        if call["task"] is None:
+            dispatch_tool_call(session, call)
+
+    # 스트림에서 사용량을 보내주지 않으면 글자 수로 대략 추정
+    if usage is not None:
+        tokens = usage.total_tokens
+    else:
+        tokens = (len(content) + sum(len(c["arguments"]) for c in calls)) // 4
+    return content, calls, tokens
+
+def format_tool_result(result):
+    """MCP 도구 결과(또는 오류 메시지)를 LLM에게 돌려줄 텍스트로 변환"""
+    if isinstance(result, str):
+        return result
+    text = "\n".join(c.text for c in result.content if isinstance(c, types.TextContent))
+    return f"오류: {text}" if result.isError else text
+
+async def run_agent_loop(session, prompt, functions, max_turns=MAX_TURNS, token_budget=TOKEN_BUDGET):
+    """질문에 답할 때까지 LLM 호출 → 도구 실행 → 결과 전달을 반복
+
+    LLM이 더 이상 도구를 호출하지 않거나, 턴 수 또는 토큰 예산을 모두 쓰면 종료합니다.
+
+    Returns:
+        LLM의 최종 응답 텍스트 (종료 조건에 걸리면 None)
+    """
+    messages = [
+        {
+        "role": "system",
+        "content": "You are a helpful assistant.",
+        },
+        {
+        "role": "user",
+        "content": prompt,  # "20에 2를 더해줘"
+        },
+    ]
+    client = None
+    tokens_used = 0
 
-    print(f"LLM 호출 중 (Model: {model_name})")
     try:
-        # Azure AI에게 질문과 함께 사용 가능한 도구 목록(functions) 전달
-        # LLM은 질문을 이해하고 적절한 도구를 선택함
-        response = client.complete(
-            messages=[
-                {
-                "role": "system",
-                "content": "You are a helpful assistant.",
-                },
-                {
-                "role": "user",
-                "content": prompt,  # "20에 2를 더해줘"
-                },
-            ],
-            model=model_name,
-            tools=functions,  # 중요! MCP 서버의 도구 목록을 LLM에게 알려줌
-            # 선택적 매개변수
-            temperature=1.0,
-            max_tokens=1000,
-            top_p=1.0    
-        )
-
-        response_message = response.choices[0].message
-        
-        functions_to_call = []
-
-        # LLM이 도구 호출을 제안했는지 확인
-        if response_message.tool_calls:
-            print("\nLLM이 다음 도구 호출을 제안했습니다:")
-            for tool_call in response_message.tool_calls:
-                print(f"   - 도구: {tool_call.function.name}")
-                print(f"   - 인수: {tool_call.function.arguments}")
-                name = tool_call.function.name
-                args = json.loads(tool_call.function.arguments)
-                functions_to_call.append({ "name": name, "args": args })
-
-        return functions_to_call
-        
-    except Exception as e:
-        print(f"LLM 호출 중 오류 발생: {e}")
-        return []
+        for turn in range(1, max_turns + 1):
+            # 첫 턴은 같은 질문 + 같은 도구 목록으로 이미 받은 계획이 있으면 LLM을 호출하지 않음
+            cached_plan = plan_cache.get(prompt) if turn == 1 else None
+            if cached_plan:
+                print("캐시된 도구 호출 계획을 사용합니다 (LLM 호출 생략)")
+                content = ""
+                calls = [
+                    {"id": f"cached_{i}", "name": f["name"], "arguments": json.dumps(f["args"]), "task": None}
+                    for i, f in enumerate(cached_plan)
+                ]
+                for call in calls:
+                    dispatch_tool_call(session, call)
+            else:
+                if client is None:
+                    client, model_name = create_llm_client()
+                    if client is None:
+                        return None
+                remaining = token_budget - tokens_used
+                if remaining <= 0:
+                    print(f"\n토큰 예산({token_budget})을 모두 사용해 종료합니다.")
+                    return None
+                print(f"\n[턴 {turn}] LLM 호출 중 (Model: {model_name})")
+                try:
+                    content, calls, tokens = await stream_llm_turn(
+                        client, model_name, messages, functions, session, min(1000, remaining)
+                    )
+                except Exception as e:
+                    print(f"LLM 호출 중 오류 발생: {e}")
+                    return None
+                tokens_used += tokens
+                # 첫 턴에 모든 인수가 올바른 도구 호출을 받은 경우만 계획 캐시에 저장
+                if turn == 1 and calls and all("args" in c for c in calls):
+                    plan_cache.put(prompt, [{"name": c["name"], "args": c["args"]} for c in calls])
+
+            if not calls:
+                return content
+
+            # LLM이 요청한 도구 호출과 그 결과를 대화에 추가하고 다음 턴으로
+            messages.append({
+                "role": "assistant",
+                "content": content,
+                "tool_calls": [
+                    {"id": c["id"], "type": "function", "function": {"name": c["name"], "arguments": c["arguments"]}}
+                    for c in calls
+                ],
+            })
+            for call in calls:
+                try:
+                    result = format_tool_result(await call["task"])
+                except Exception as e:
+                    result = f"도구 실행 중 오류 발생: {e}"
+                print(f"  결과: {call['name']} -> {result}")
+                messages.append({"role": "tool", "tool_call_id": call["id"], "content": result})
+
+        print(f"\n최대 턴 수({max_turns})에 도달해 종료합니다.")
+        return None
+    finally:
+        if client is not None:
+            await client.close()
 
 def convert_to_llm_tool(tool):
     """MCP 도구 스키마를 Azure AI가 이해할 수 있는 형식으로 변환
@@ -123,6 +282,31 @@ def convert_to_llm_tool(tool):
 
     return tool_schema
 
+async def load_tools(session):
+    """서버의 도구 목록을 조회해 Azure AI 형식으로 변환하고 계획 캐시에 등록"""
+    tools = await session.list_tools()
+
+    functions = []  # Azure AI에게 전달할 도구 목록
+
+    for tool in tools.tools:
+        print(f"  도구 발견: {tool.name} - {tool.description}")
+        # MCP 도구 스키마를 Azure AI 형식으로 변환
+        functions.append(convert_to_llm_tool(tool))
+
+    # 도구 목록이 바뀌었으면 이전 도구 목록으로 만든 계획은 무효화됨
+    if plan_cache.bind_tools(functions):
+        print("  도구 목록이 변경되어 계획 캐시를 초기화했습니다.")
+    # 추가/변경/삭제된 도구만 다시 색인
+    tool_index.update(functions)
+    return functions
+
+async def message_handler(message):
+    """서버가 도구 목록 변경을 알리면 계획 캐시를 무효화"""
+    if isinstance(message, types.ServerNotification) and isinstance(
+        message.root, types.ToolListChangedNotification
+    ):
+        plan_cache.invalidate()
+
 async def run():
     """메인 실행 함수 - MCP 클라이언트의 전체 워크플로우"""
     
@@ -132,7 +316,7 @@ async def run():
     
     # MCP 서버와 stdio 연결 수립
     async with stdio_client(server_params) as (read, write):
-        async with ClientSession(read, write) as session:
+        async with ClientSession(read, write, message_handler=message_handler) as session:
             
             # ========== 2단계: MCP 서버 초기화 및 기능 탐색 ==========
             print("\n[1단계] MCP 서버에 연결 중...")
@@ -147,32 +331,27 @@ async def run():
 
             # 사용 가능한 도구 목록 조회 (예: add, subtract 등)
             print("\n[3단계] 서버의 도구 탐색 중...")
-            tools = await session.list_tools()
-
-            functions = []  # Azure AI에게 전달할 도구 목록
-
-            for tool in tools.tools:
-                print(f"  도구 발견: {tool.name} - {tool.description}")
-                # MCP 도구 스키마를 Azure AI 형식으로 변환
-                functions.append(convert_to_llm_tool(tool))
+            functions = await load_tools(session)
             
             # ========== 4단계: 사용자 질문 처리 ==========
             prompt = "20에 2를 더해줘"
             print(f"\n[4단계] 사용자 질문: '{prompt}'")
 
-            # LLM에게 질문하고 어떤 도구를 사용할지 결정받기
-            functions_to_call = call_llm(prompt, functions)
-
-            # ========== 5단계: 도구 실행 ==========
-            if functions_to_call:
-                print("\n[5단계] MCP 서버에서 도구 실행 중...")
-                for f in functions_to_call:
-                    print(f"\n  실행: {f['name']}({f['args']})")
-                    # MCP 서버의 도구를 실제로 호출
-                    result = await session.call_tool(f["name"], arguments=f["args"])
-                    print(f"  결과: {result.content}")
-            else:
-                print("\nLLM이 도구를 호출하지 않았습니다.")
+            # 그 사이 도구 목록 변경 알림을 받았다면 다시 조회
+            if plan_cache.tools_hash is None:
+                functions = await load_tools(session)
+
+            # 전체 도구 대신 질문과 관련된 상위 k개의 도구 스키마만 LLM에게 전달
+            functions = tool_index.search(prompt, TOOL_TOP_K)
+            if len(functions) < len(tool_index):
+                print(f"  관련 도구 {len(functions)}/{len(tool_index)}개 선택: {[f['function']['name'] for f in functions]}")
+
+            # ========== 5단계: LLM ↔ 도구 실행 반복 ==========
+            # LLM이 도구를 제안하면 바로 실행하고, 결과를 다시 LLM에게 전달
+            # (최종 답변은 스트리밍되는 동안 화면에 출력됨)
+            answer = await run_agent_loop(session, prompt, functions)
+            if answer is None:
+                print("\nLLM의 최종 답변을 받지 못했습니다.")
             
             print("\n" + "="*60)
             print("완료!")
@@ -180,7 +359,6 @@ async def run():
 
 
 if __name__ == "__main__":
-    import asyncio
     # 환경 변수 설정 예시 (실제 실행 시에는 시스템 환경 변수에 설정하는 것이 좋습니다)
     # os.environ["AZURE_INFERENCE_ENDPOINT"] = "https://<your-endpoint>.models.ai.azure.com"
     # os.environ["AZURE_INFERENCE_CREDENTIAL"] = "<your-key>"
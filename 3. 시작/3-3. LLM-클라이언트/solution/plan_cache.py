@@ -0,0 +1,129 @@
+"""LLM 도구 호출 계획(plan) 캐시.
+
+같은 질문("20에 2를 더해줘")을 같은 도구 목록으로 다시 물으면 LLM은 같은 도구 호출을
+제안하므로, 그 결과를 저장해 두고 LLM 호출을 건너뜁니다.
+
+- 키: 정규화한 프롬프트 + 도구 스키마 해시
+- 메모리 계층: TTL + LRU 방식으로 최대 `maxsize`개 보관
+- 디스크 계층(선택): `path`를 지정하면 sqlite 파일에 저장해 프로세스 재시작 후에도 재사용
+- 서버의 도구 목록이 바뀌면(`bind_tools`) 이전 도구 목록으로 만든 계획은 모두 무효화
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import time
+import unicodedata
+from collections import OrderedDict
+
+
+def normalize_prompt(prompt):
+    """공백/대소문자/전각 문자와 끝의 문장 부호 차이를 없앱니다."""
+    text = unicodedata.normalize("NFKC", prompt).casefold()
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.rstrip(" .!?~")
+
+
+def hash_tools(functions):
+    """LLM에 전달하는 도구 스키마 목록의 해시를 계산합니다 (순서 무관)."""
+    canonical = sorted(json.dumps(f, sort_keys=True, ensure_ascii=False) for f in functions)
+    return hashlib.sha256("\n".join(canonical).encode("utf-8")).hexdigest()
+
+
+class PlanCache:
+    def __init__(self, maxsize=256, ttl=3600, path=None):
+        """
+        Args:
+            maxsize: 메모리에 보관할 최대 항목 수 (초과 시 가장 오래 사용하지 않은 항목부터 제거)
+            ttl: 항목 유효 시간(초). None이면 만료되지 않습니다.
+            path: 디스크 계층으로 사용할 sqlite 파일 경로 (None이면 메모리만 사용)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.tools_hash = None
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # prompt -> (저장 시각, 계획)
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS plans ("
+                "tools_hash TEXT, prompt TEXT, plan TEXT, created REAL, "
+                "PRIMARY KEY (tools_hash, prompt))"
+            )
+            self._db.commit()
+
+    def bind_tools(self, functions):
+        """현재 서버의 도구 목록을 지정합니다.
+
+        도구 목록이 이전과 다르면 캐시를 비우고 True를 반환합니다.
+        """
+        tools_hash = hash_tools(functions)
+        if tools_hash == self.tools_hash:
+            return False
+        self.tools_hash = tools_hash
+        self._entries.clear()
+        if self._db is not None:
+            # 다른 도구 목록으로 만든 계획과 만료된 계획을 정리
+            expires = time.time() - self.ttl if self.ttl is not None else float("-inf")
+            self._db.execute(
+                "DELETE FROM plans WHERE tools_hash != ? OR created < ?", (tools_hash, expires)
+            )
+            self._db.commit()
+        return True
+
+    def invalidate(self):
+        """도구 목록 변경 알림을 받았을 때 호출합니다.
+
+        다음 `bind_tools` 호출 전까지는 캐시를 사용하지 않습니다.
+        """
+        self.tools_hash = None
+        self._entries.clear()
+
+    def get(self, prompt):
+        """저장된 계획을 반환합니다. 없거나 만료되었으면 None을 반환합니다."""
+        if self.tools_hash is None:
+            return None
+        key = normalize_prompt(prompt)
+        entry = self._entries.get(key)
+        if entry is None and self._db is not None:
+            row = self._db.execute(
+                "SELECT created, plan FROM plans WHERE tools_hash = ? AND prompt = ?",
+                (self.tools_hash, key),
+            ).fetchone()
+            if row is not None:
+                entry = (row[0], json.loads(row[1]))
+                self._entries[key] = entry
+        if entry is None or self._expired(entry[0]):
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._evict()
+        self.hits += 1
+        return entry[1]
+
+    def put(self, prompt, plan):
+        """LLM이 제안한 도구 호출 계획을 저장합니다."""
+        if self.tools_hash is None:
+            return
+        key = normalize_prompt(prompt)
+        created = time.time()
+        self._entries[key] = (created, plan)
+        self._entries.move_to_end(key)
+        self._evict()
+        if self._db is not None:
+            self._db.execute(
+                "INSERT OR REPLACE INTO plans VALUES (?, ?, ?, ?)",
+                (self.tools_hash, key, json.dumps(plan, ensure_ascii=False), created),
+            )
+            self._db.commit()
+
+    def _expired(self, created):
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def _evict(self):
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
@@ -13,7 +13,7 @@ mcp = FastMCP("Demo")
 # 덧셈 도구 추가
 @mcp.tool()
 def add(a: int, b: int) -> int:
-    """두 숫자의 합을 계산합니다."""
+    """두 숫자를 더해 합을 계산합니다."""
     return a + b
 
 
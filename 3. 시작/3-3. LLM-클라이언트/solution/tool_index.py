@@ -0,0 +1,153 @@
+"""질문과 관련된 도구만 골라 LLM에게 전달하기 위한 로컬 BM25 색인.
+
+서버가 수백 개의 도구를 제공하면 모든 스키마를 매번 LLM에게 보내는 것만으로
+프롬프트 토큰과 응답 지연이 커집니다. 도구 이름, 설명, 매개변수 이름/설명으로
+색인을 만들어 두고, 질문과 관련도가 높은 상위 k개만 전달합니다.
+
+- 네트워크 없이 동작하는 어휘 기반(BM25) 점수 사용
+- 한글/한자 구간은 글자 2-gram으로 토큰화하고, 한글 단어는 자주 쓰는 조사와
+  '하다' 활용 어미를 떼어 낸 형태도 함께 색인 ("더해줘", "더합니다" -> "더하")
+- 도구 목록이 바뀌면 추가/변경/삭제된 도구만 다시 색인 (`update`)
+"""
+
+import hashlib
+import heapq
+import json
+import math
+import re
+from collections import Counter
+
+_WORD_RE = re.compile(r"[A-Za-z]+|[0-9]+|[぀-ヿ㐀-鿿가-힣]+")
+_CAMEL_RE = re.compile(r"(?<=[a-z])(?=[A-Z])")
+_CJK_RE = re.compile(r"[぀-ヿ㐀-鿿가-힣]")
+_HANGUL_RE = re.compile(r"[가-힣]+")
+
+# 단어 끝에서 떼어 낼 조사 (긴 것부터 검사)
+_PARTICLES = ("에서", "에게", "까지", "부터", "으로", "을", "를", "이", "가", "은", "는", "에", "의", "로", "와", "과", "도", "만")
+# '하다' 동사의 활용 어미 -> 어간 + '하'
+_HA_VERB_RE = re.compile(r"(.+?)(해주세요|해줘|해요|해서|했습니다|했다|합니다|합시다|한다|하는|하고|하여|하기|하다|해|합|한|할|하)")
+
+
+def tokenize(text):
+    """영문은 단어(snake_case/camelCase 분리), 한글/한자는 글자 2-gram 토큰으로 분리합니다."""
+    tokens = []
+    for word in _WORD_RE.findall(_CAMEL_RE.sub(" ", text or "")):
+        if word.isdigit():
+            continue  # "20에 2를"의 숫자는 도구 선택에 도움이 되지 않음
+        if _CJK_RE.match(word):
+            if len(word) == 1:
+                tokens.append(word)
+            tokens.extend(word[i : i + 2] for i in range(len(word) - 1))
+            if _HANGUL_RE.fullmatch(word):
+                stem = _stem(word)
+                if stem != word:
+                    tokens.append(stem)
+        else:
+            tokens.append(word.lower())
+    return tokens
+
+
+def _stem(word):
+    """한글 단어에서 조사 하나를 떼고, '하다' 활용형은 '<어간>하'로 맞춥니다.
+
+    형태소 분석기 없이 자주 쓰는 형태만 처리합니다. 예: "숫자를" -> "숫자",
+    "더해줘"/"더합니다" -> "더하", "계산해" -> "계산하"
+
+    조사를 떼고 남는 어간이 두 글자 이상일 때만 떼므로 "추가", "나이", "사이" 같은
+    명사는 그대로 둡니다.
+    """
+    for particle in _PARTICLES:
+        if len(word) - len(particle) >= 2 and word.endswith(particle):
+            word = word[: -len(particle)]
+            break
+    match = _HA_VERB_RE.fullmatch(word)
+    return match.group(1) + "하" if match else word
+
+
+def _tool_text(function):
+    """Azure AI 형식의 도구 스키마에서 색인할 텍스트를 만듭니다."""
+    spec = function["function"]
+    parts = [spec["name"], spec.get("description") or ""]
+    for name, prop in spec.get("parameters", {}).get("properties", {}).items():
+        parts.append(name)
+        parts.append(prop.get("description") or "")
+    return " ".join(parts)
+
+
+class ToolIndex:
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._functions = {}  # 도구 이름 -> 도구 스키마 (서버가 준 순서 유지)
+        self._docs = {}  # 도구 이름 -> (스키마 해시, 토큰 빈도, 문서 길이)
+        self._postings = {}  # 토큰 -> {도구 이름: 빈도}
+        self._total_length = 0
+
+    def __len__(self):
+        return len(self._functions)
+
+    def update(self, functions):
+        """도구 목록을 반영합니다. 바뀐 도구만 다시 색인하고, 변경된 도구 수를 반환합니다."""
+        names = {f["function"]["name"] for f in functions}
+        changed = 0
+        for name in [n for n in self._docs if n not in names]:
+            self._remove(name)
+            changed += 1
+        for function in functions:
+            name = function["function"]["name"]
+            digest = hashlib.sha256(json.dumps(function, sort_keys=True).encode("utf-8")).hexdigest()
+            if name in self._docs and self._docs[name][0] == digest:
+                continue
+            if name in self._docs:
+                self._remove(name)
+            self._add(name, digest, tokenize(_tool_text(function)))
+            changed += 1
+        self._functions = {f["function"]["name"]: f for f in functions}
+        return changed
+
+    def search(self, query, top_k):
+        """질문과 관련도가 높은 순서로 최대 top_k개의 도구 스키마를 반환합니다.
+
+        도구가 top_k개 이하이면 모두 반환하고, 관련된 도구가 top_k개보다 적으면
+        나머지는 서버가 준 순서대로 채웁니다.
+        """
+        if len(self._functions) <= top_k:
+            return list(self._functions.values())
+
+        n = len(self._docs)
+        avg_length = self._total_length / n
+        scores = Counter()
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for name, tf in postings.items():
+                length = self._docs[name][2]
+                scores[name] += idf * tf * (self.k1 + 1) / (
+                    tf + self.k1 * (1 - self.b + self.b * length / avg_length)
+                )
+
+        selected = heapq.nlargest(top_k, scores, key=scores.__getitem__)
+        for name in self._functions:
+            if len(selected) >= top_k:
+                break
+            if name not in scores:
+                selected.append(name)
+        return [self._functions[name] for name in selected]
+
+    def _add(self, name, digest, tokens):
+        freqs = Counter(tokens)
+        self._docs[name] = (digest, freqs, len(tokens))
+        self._total_length += len(tokens)
+        for term, tf in freqs.items():
+            self._postings.setdefault(term, {})[name] = tf
+
+    def _remove(self, name):
+        _, freqs, length = self._docs.pop(name)
+        self._total_length -= length
+        for term in freqs:
+            postings = self._postings[term]
+            del postings[name]
+            if not postings:
+                del self._postings[term]
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""stdio MCP 서버용 JSON-RPC 녹화/재생 도구.
+
+실제 클라이언트와 서버 사이의 메시지를 녹화해 두고, 같은 트래픽으로 서버를
+반복 실행해 성능을 측정합니다.
+
+녹화 - 클라이언트 설정에서 서버 실행 명령 앞에 녹화기를 끼워 넣습니다:
+
+    python jsonrpc_replay.py record session.jsonl.gz -- python server.py
+
+재생 - 녹화 파일로 서버 프로세스를 실행하고 처리량/지연 시간/응답 불일치를 보고합니다:
+
+    python jsonrpc_replay.py replay session.jsonl.gz --procs 4 --repeat 20 --fast -- python server.py
+
+녹화 파일은 gzip으로 압축한 JSON Lines 형식입니다. 첫 줄은 헤더이고, 이후 각 줄은
+`[경과 시간(초), 방향("c": 클라이언트→서버, "s": 서버→클라이언트), 메시지]`입니다.
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import math
+import sys
+import time
+
+# 로깅 설정 (stdio 녹화 중에는 stdout을 사용할 수 없으므로 stderr 사용)
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler()]
+)
+logger = logging.getLogger("jsonrpc_replay")
+
+CLIENT = "c"
+SERVER = "s"
+
+
+def _parse(line):
+    try:
+        return json.loads(line)
+    except ValueError:
+        return line.decode("utf-8", errors="replace").rstrip("\r\n")
+
+
+# ========== 녹화 ==========
+
+async def record(path, command):
+    """클라이언트(stdin/stdout)와 서버 프로세스 사이에서 메시지를 전달하며 녹화합니다."""
+    process = await asyncio.create_subprocess_exec(
+        *command, stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE
+    )
+    start = time.monotonic()
+    with gzip.open(path, "wt", encoding="utf-8") as out:
+        out.write(json.dumps({"version": 1, "command": command, "recorded_at": time.time()}) + "\n")
+
+        def write(direction, line):
+            entry = [round(time.monotonic() - start, 6), direction, _parse(line)]
+            out.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+        async def client_to_server():
+            while True:
+                # Windows에서도 동작하도록 stdin은 스레드에서 읽음
+                line = await asyncio.to_thread(sys.stdin.buffer.readline)
+                if not line:
+                    break
+                write(CLIENT, line)
+                process.stdin.write(line)
+                await process.stdin.drain()
+            process.stdin.close()
+
+        async def server_to_client():
+            while line := await process.stdout.readline():
+                write(SERVER, line)
+                sys.stdout.buffer.write(line)
+                sys.stdout.buffer.flush()
+
+        forward = asyncio.create_task(client_to_server())
+        await server_to_client()
+        forward.cancel()
+        await process.wait()
+    logger.info("녹화 완료: %s", path)
+
+
+# ========== 재생 ==========
+
+def load_recording(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        f.readline()  # 헤더
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _is_request(message):
+    return isinstance(message, dict) and "method" in message and "id" in message
+
+
+def _is_response(message):
+    return isinstance(message, dict) and "id" in message and ("result" in message or "error" in message)
+
+
+async def replay_once(recording, command, fast, timeout):
+    """서버 프로세스 하나를 실행해 녹화된 클라이언트 메시지를 보내고 결과를 수집합니다.
+
+    Returns:
+        (결과 목록, 시작 시간, 처리 구간)
+        - 결과 목록: [(메서드, 지연 시간(초) 또는 None(시간 초과), 녹화된 응답과 일치 여부)]
+        - 시작 시간: 프로세스 실행부터 `initialize` 응답까지 걸린 시간(초), 응답이 없으면 None
+        - 처리 구간: `initialize` 이후 첫 요청을 보낸 시각부터 마지막 응답을 받은 시각까지의
+          (시작, 끝) `perf_counter` 값, 해당 요청이 없으면 None
+    """
+    expected = {}
+    for _, direction, message in recording:
+        if direction == SERVER and _is_response(message):
+            expected[message["id"]] = message
+
+    spawned_at = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    loop = asyncio.get_running_loop()
+    pending = {}  # 요청 id -> (메서드, 보낸 시각, future)
+    startup = None
+    first_sent_at = None  # initialize 이후 첫 요청을 보낸 시각
+
+    async def read_responses():
+        while line := await process.stdout.readline():
+            message = _parse(line)
+            if _is_response(message) and message["id"] in pending:
+                future = pending[message["id"]][2]
+                if not future.done():
+                    future.set_result((time.perf_counter(), message))
+
+    reader = asyncio.create_task(read_responses())
+    start = time.monotonic()
+    first_offset = recording[0][0] if recording else 0.0
+    try:
+        for offset, direction, message in recording:
+            if direction != CLIENT:
+                continue
+            if not fast:
+                # 녹화 당시의 간격을 그대로 재현
+                delay = (offset - first_offset) - (time.monotonic() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            line = message if isinstance(message, str) else json.dumps(message, separators=(",", ":"))
+            if _is_request(message):
+                sent_at = time.perf_counter()
+                if startup is not None and first_sent_at is None:
+                    first_sent_at = sent_at
+                pending[message["id"]] = (message["method"], sent_at, loop.create_future())
+            process.stdin.write(line.encode("utf-8") + b"\n")
+            await process.stdin.drain()
+            # 초기화가 끝나기 전에는 다른 요청을 보낼 수 없음
+            if _is_request(message) and message["method"] == "initialize":
+                await asyncio.wait_for(asyncio.shield(pending[message["id"]][2]), timeout)
+                startup = pending[message["id"]][2].result()[0] - spawned_at
+
+        # 남은 응답 전체를 하나의 기한으로 기다림 (요청마다 기다리면 최대 N × timeout)
+        futures = [future for _, _, future in pending.values()]
+        if futures:
+            await asyncio.wait(futures, timeout=timeout)
+
+        results = []
+        last_received_at = None
+        for request_id, (method, sent_at, future) in pending.items():
+            if not future.done():
+                results.append((method, None, False))
+                continue
+            received_at, response = future.result()
+            if first_sent_at is not None and sent_at >= first_sent_at:
+                last_received_at = max(received_at, last_received_at or received_at)
+            matched = request_id not in expected or _normalize(response) == _normalize(expected[request_id])
+            results.append((method, received_at - sent_at, matched))
+        window = (first_sent_at, last_received_at) if last_received_at is not None else None
+        return results, startup, window
+    finally:
+        reader.cancel()
+        if process.returncode is None:
+            process.stdin.close()
+            try:
+                await asyncio.wait_for(process.wait(), 5)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+
+
+def _normalize(message):
+    return {k: v for k, v in message.items() if k != "jsonrpc"}
+
+
+def percentile(values, p):
+    """정렬된 목록의 nearest-rank 백분위수."""
+    if not values:
+        return float("nan")
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def _busy_time(windows):
+    """처리 구간들의 합집합 길이(초). 여러 프로세스가 동시에 처리한 시간은 한 번만 셉니다."""
+    total = 0.0
+    end = -math.inf
+    for window_start, window_end in sorted(windows):
+        if window_end <= end:
+            continue
+        total += window_end - max(window_start, end)
+        end = window_end
+    return total
+
+
+def report(results, startups, windows, elapsed):
+    """서버 시작 시간, 처리량, 메서드별 지연 시간 백분위수, 시간 초과/불일치 수를 출력합니다.
+
+    처리량은 서버 시작과 `initialize`를 뺀, 프로세스들이 요청을 처리하던 구간으로 계산합니다.
+    """
+    by_method = {}
+    for method, latency, matched in results:
+        by_method.setdefault(method, []).append((latency, matched))
+
+    if startups:
+        print(
+            f"서버 시작 {len(startups)}회 (initialize 응답까지): "
+            f"평균 {sum(startups) / len(startups) * 1000:.1f}ms, 최대 {max(startups) * 1000:.1f}ms"
+        )
+    completed = sum(1 for method, latency, _ in results if latency is not None and method != "initialize")
+    busy = _busy_time(windows)
+    throughput = f"{completed / busy:.1f} req/s" if busy > 0 else "측정 불가"
+    print(f"요청 {completed}개 / 처리 구간 {busy:.2f}초 (전체 {elapsed:.2f}초) -> 처리량 {throughput}")
+    print(f"{'method':<28}{'count':>7}{'p50(ms)':>10}{'p90(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}{'timeout':>9}{'mismatch':>10}")
+    for method, items in sorted(by_method.items()) + [("(total)", [(l, m) for _, l, m in results])]:
+        latencies = sorted(l * 1000 for l, _ in items if l is not None)
+        timeouts = sum(1 for l, _ in items if l is None)
+        mismatches = sum(1 for l, m in items if l is not None and not m)
+        print(
+            f"{method:<28}{len(items):>7}"
+            f"{percentile(latencies, 50):>10.2f}{percentile(latencies, 90):>10.2f}"
+            f"{percentile(latencies, 99):>10.2f}{(latencies[-1] if latencies else float('nan')):>10.2f}"
+            f"{timeouts:>9}{mismatches:>10}"
+        )
+
+
+async def replay(paths, command, procs, repeat, fast, timeout):
+    """녹화 파일들을 `repeat`번씩, 최대 `procs`개의 서버 프로세스로 동시에 재생합니다."""
+    recordings = [load_recording(path) for path in paths]
+    jobs = [recording for _ in range(repeat) for recording in recordings]
+    semaphore = asyncio.Semaphore(procs)
+
+    async def run_job(recording):
+        async with semaphore:
+            return await replay_once(recording, command, fast, timeout)
+
+    start = time.perf_counter()
+    runs = await asyncio.gather(*(run_job(recording) for recording in jobs))
+    elapsed = time.perf_counter() - start
+    report(
+        [item for results, _, _ in runs for item in results],
+        [startup for _, startup, _ in runs if startup is not None],
+        [window for _, _, window in runs if window is not None],
+        elapsed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="stdio MCP 서버용 JSON-RPC 녹화/재생 도구")
+    subparsers = parser.add_subparsers(dest="mode", required=True)
+
+    record_parser = subparsers.add_parser("record", help="클라이언트와 서버 사이의 메시지를 녹화")
+    record_parser.add_argument("output", help="녹화 파일 경로 (예: session.jsonl.gz)")
+
+    replay_parser = subparsers.add_parser("replay", help="녹화 파일로 서버를 실행하고 성능을 측정")
+    replay_parser.add_argument("recordings", nargs="+", help="녹화 파일 경로")
+    replay_parser.add_argument("--procs", type=int, default=1, help="동시에 실행할 서버 프로세스 수")
+    replay_parser.add_argument("--repeat", type=int, default=1, help="녹화 파일별 반복 횟수")
+    replay_parser.add_argument("--fast", action="store_true", help="녹화 간격을 무시하고 최대한 빠르게 전송")
+    replay_parser.add_argument("--timeout", type=float, default=30.0, help="응답 대기 시간(초)")
+
+    # `--` 뒤는 서버 실행 명령
+    argv = sys.argv[1:]
+    if "--" not in argv:
+        parser.error("서버 실행 명령을 `--` 뒤에 지정하세요 (예: -- python server.py)")
+    split = argv.index("--")
+    args = parser.parse_args(argv[:split])
+    command = argv[split + 1:]
+
+    if args.mode == "record":
+        asyncio.run(record(args.output, command))
+    else:
+        asyncio.run(replay(args.recordings, command, args.procs, args.repeat, args.fast, args.timeout))
+
+
+if __name__ == "__main__":
+    main()
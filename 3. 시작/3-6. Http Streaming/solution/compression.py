@@ -0,0 +1,149 @@
+"""streamable-http 응답 압축 ASGI 미들웨어.
+
+`tools/list` 카탈로그나 큰 도구 결과는 JSON 텍스트라 압축이 잘 되지만, MCP 서버는
+기본적으로 압축하지 않은 채 응답합니다. 이 미들웨어는 클라이언트의 `Accept-Encoding`을
+보고 gzip 또는 deflate로 응답을 압축합니다.
+
+- `minimum_size`보다 작은 단일 응답(계산기 결과 등)은 압축하지 않습니다.
+- SSE(`text/event-stream`) 응답은 크기와 관계없이 압축합니다. 첫 이벤트가 작은 진행
+  알림이어도 뒤따르는 큰 도구 결과가 압축되도록, 첫 청크 크기로 판단하지 않습니다.
+  이벤트(청크)마다 `Z_SYNC_FLUSH`로 내보내므로 압축 때문에 이벤트 전달이 늦어지지 않습니다.
+- 압축 전후 바이트 수를 `CompressionStats`에 누적합니다.
+
+Starlette의 GZipMiddleware는 `text/event-stream` 응답을 압축하지 않고 통계도 없어
+직접 구현했습니다.
+"""
+
+import zlib
+
+# 압축 효과가 있는 Content-Type (이미지 등 이미 압축된 형식은 제외)
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript")
+
+# 서버가 선호하는 순서
+_WBITS = {"gzip": 16 + zlib.MAX_WBITS, "deflate": zlib.MAX_WBITS}
+
+
+class CompressionStats:
+    """압축 결과 누적 카운터."""
+
+    def __init__(self):
+        self.compressed_responses = 0
+        self.skipped_responses = 0
+        self.bytes_in = 0  # 압축한 응답의 원본 크기
+        self.bytes_out = 0  # 압축한 응답의 전송 크기
+
+    def as_dict(self):
+        return {
+            "compressed_responses": self.compressed_responses,
+            "skipped_responses": self.skipped_responses,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "bytes_saved": self.bytes_in - self.bytes_out,
+        }
+
+
+def negotiate_encoding(accept_encoding):
+    """`Accept-Encoding` 헤더에서 지원하는 인코딩 중 품질값(q)이 가장 높은 것을 고릅니다."""
+    qualities = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().lower().partition(";")
+        params = params.strip()
+        try:
+            qualities[name.strip()] = float(params[2:]) if params.startswith("q=") else 1.0
+        except ValueError:
+            continue
+    best, best_q = None, 0.0
+    for encoding in _WBITS:
+        # 명시된 인코딩이 없으면 "*"의 품질값을 따름. 같은 q라면 서버 선호 순서(gzip 우선)
+        q = qualities.get(encoding, qualities.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size=1024, compresslevel=6, stats=None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+        self.stats = stats if stats is not None else CompressionStats()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        encoding = negotiate_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressionResponder(self, encoding, send).run(scope, receive)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware, encoding, send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message = None
+        self.compressor = None
+        self.decided = False
+
+    async def run(self, scope, receive):
+        await self.middleware.app(scope, receive, self.send_wrapper)
+
+    async def send_wrapper(self, message):
+        if message["type"] == "http.response.start":
+            # 첫 본문 청크를 보고 압축 여부를 정할 때까지 헤더 전송을 미룸
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if not self.decided:
+            if more_body and not body:
+                return  # 빈 청크로는 크기를 판단할 수 없으므로 다음 청크를 기다림
+            self.decided = True
+            if self._should_compress(body):
+                self._start_compression()
+            else:
+                self.middleware.stats.skipped_responses += 1
+            await self.send(self.start_message)
+
+        if self.compressor is None:
+            await self.send(message)
+            return
+
+        stats = self.middleware.stats
+        data = self.compressor.compress(body)
+        # 스트리밍 중에는 청크마다 SYNC_FLUSH로 지금까지의 데이터를 바로 내보냄
+        data += self.compressor.flush(zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH)
+        stats.bytes_in += len(body)
+        stats.bytes_out += len(data)
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    def _should_compress(self, first_chunk):
+        headers = {k.lower(): v for k, v in self.start_message["headers"]}
+        if b"content-encoding" in headers:
+            return False
+        content_type = headers.get(b"content-type", b"").decode("latin-1")
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return False
+        if content_type.startswith("text/event-stream"):
+            return True
+        # 단일 응답은 전체 크기로 판단
+        return len(first_chunk) >= self.middleware.minimum_size
+
+    def _start_compression(self):
+        self.compressor = zlib.compressobj(self.middleware.compresslevel, zlib.DEFLATED, _WBITS[self.encoding])
+        self.middleware.stats.compressed_responses += 1
+        headers = [
+            (k, v) for k, v in self.start_message["headers"] if k.lower() not in (b"content-length", b"vary")
+        ]
+        vary = [v for k, v in self.start_message["headers"] if k.lower() == b"vary"]
+        headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+        headers.append((b"vary", b", ".join(vary + [b"Accept-Encoding"])))
+        self.start_message = {**self.start_message, "headers": headers}
@@ -0,0 +1,168 @@
+"""streamable-http MCP 서버의 상태 확인(probe)과 종료 시 연결 드레이닝.
+
+Azure Container Apps는 축소(scale-in)나 새 리비전 배포 때 복제본에 SIGTERM을 보내고,
+유예 시간이 지나면 프로세스를 강제로 종료합니다. uvicorn은 SIGTERM을 받으면 바로
+종료 절차에 들어가므로 `process_files`처럼 오래 걸리는 도구 호출이 중간에 끊기고,
+클라이언트가 처음부터 다시 시도하면서 부하가 두 배가 됩니다.
+
+- `/healthz` (liveness): 프로세스가 요청을 처리할 수 있으면 항상 200
+- `/readyz` (readiness): 드레이닝 중에는 503을 반환해 새 트래픽이 다른 복제본으로 가게 함
+- 첫 SIGTERM/SIGINT에서 드레이닝을 시작합니다.
+  - 새 세션(`mcp-session-id` 헤더가 없는 요청)은 503과 `Retry-After`로 거절합니다.
+  - 기존 세션의 진행 중인 도구 호출과 스트림은 `drain_timeout`까지 기다립니다.
+  - 진행 중인 요청이 없어지거나 기한이 지나면 정상 종료합니다.
+- 드레이닝 중 두 번째 신호를 받으면 기다리지 않고 종료합니다.
+
+사용 예:
+
+    from lifecycle import serve
+    serve(mcp.streamable_http_app(), host="0.0.0.0", port=8000, drain_timeout=20)
+"""
+
+import json
+import logging
+import signal
+import time
+
+import uvicorn
+
+logger = logging.getLogger("mcp_lifecycle")
+
+LIVENESS_PATH = "/healthz"
+READINESS_PATH = "/readyz"
+
+
+class DrainState:
+    """드레이닝 여부와 진행 중인 요청 수."""
+
+    def __init__(self):
+        self.draining = False
+        self.deadline = None
+        self.inflight = 0
+        self.rejected = 0  # 드레이닝 중 거절한 새 세션 수
+
+    def begin_drain(self, timeout):
+        self.draining = True
+        self.deadline = time.monotonic() + timeout
+
+    def drained(self):
+        """드레이닝 중이고, 진행 중인 요청이 모두 끝났거나 기한이 지났으면 True."""
+        if not self.draining:
+            return False
+        return self.inflight == 0 or time.monotonic() >= self.deadline
+
+    def as_dict(self):
+        return {
+            "status": "draining" if self.draining else "ready",
+            "inflight": self.inflight,
+            "rejected": self.rejected,
+        }
+
+
+class LifecycleMiddleware:
+    """probe 엔드포인트를 제공하고, 진행 중인 요청을 세며, 드레이닝 중 새 세션을 거절합니다."""
+
+    def __init__(self, app, state=None, mcp_path="/mcp", retry_after=5):
+        self.app = app
+        self.state = state if state is not None else DrainState()
+        self.mcp_path = mcp_path
+        self.retry_after = retry_after
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if path == LIVENESS_PATH:
+            await _send_json(send, 200, {"status": "ok"})
+            return
+        if path == READINESS_PATH:
+            await _send_json(send, 503 if self.state.draining else 200, self.state.as_dict())
+            return
+
+        is_mcp = path.rstrip("/") == self.mcp_path
+        headers = dict(scope["headers"])
+        if self.state.draining and is_mcp and b"mcp-session-id" not in headers:
+            self.state.rejected += 1
+            await _send_json(
+                send,
+                503,
+                {"error": "server is draining"},
+                [(b"retry-after", str(self.retry_after).encode("latin-1")), (b"connection", b"close")],
+            )
+            return
+
+        # GET /mcp는 서버 알림용으로 계속 열려 있는 스트림이라 드레이닝 대상에서 제외
+        # (종료 시 uvicorn의 timeout_graceful_shutdown 후 닫힘)
+        if is_mcp and scope["method"] == "GET":
+            await self.app(scope, receive, send)
+            return
+
+        self.state.inflight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.state.inflight -= 1
+
+
+async def _send_json(send, status, payload, extra_headers=()):
+    body = json.dumps(payload).encode("utf-8")
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode("latin-1")),
+        (b"cache-control", b"no-store"),
+        *extra_headers,
+    ]
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+class DrainingServer(uvicorn.Server):
+    """첫 종료 신호에서 바로 종료하지 않고 드레이닝을 거친 뒤 종료하는 uvicorn 서버."""
+
+    def __init__(self, config, state, drain_timeout):
+        super().__init__(config)
+        self.state = state
+        self.drain_timeout = drain_timeout
+
+    def handle_exit(self, sig, frame):
+        if self.state.draining:
+            logger.warning("드레이닝 중 신호(%s)를 다시 받아 바로 종료합니다", signal.Signals(sig).name)
+            super().handle_exit(sig, frame)
+            return
+        logger.info(
+            "신호(%s) 수신: 드레이닝 시작 (진행 중인 요청 %d개, 최대 %.0f초 대기)",
+            signal.Signals(sig).name, self.state.inflight, self.drain_timeout,
+        )
+        self.state.begin_drain(self.drain_timeout)
+
+    async def on_tick(self, counter):
+        if not self.should_exit and self.state.drained():
+            if self.state.inflight:
+                logger.warning("드레이닝 기한 초과: 진행 중인 요청 %d개를 남기고 종료합니다", self.state.inflight)
+            else:
+                logger.info("드레이닝 완료: 서버를 종료합니다")
+            self.should_exit = True
+        return await super().on_tick(counter)
+
+
+def serve(app, host, port, drain_timeout=20.0, shutdown_timeout=5.0, state=None, **kwargs):
+    """`app`을 probe/드레이닝 미들웨어로 감싸 실행합니다.
+
+    Args:
+        drain_timeout: 종료 신호 후 진행 중인 요청을 기다리는 최대 시간(초)
+        shutdown_timeout: 드레이닝 후 남은 연결(GET 알림 스트림 등)을 닫기까지 기다리는 시간(초)
+
+    `drain_timeout + shutdown_timeout`은 컨테이너의 종료 유예 시간(ACA 기본 30초)보다
+    짧아야 합니다.
+    """
+    state = state if state is not None else DrainState()
+    config = uvicorn.Config(
+        LifecycleMiddleware(app, state),
+        host=host,
+        port=port,
+        timeout_graceful_shutdown=shutdown_timeout,
+        **kwargs,
+    )
+    DrainingServer(config, state, drain_timeout).run()
@@ -10,10 +10,18 @@ from mcp.types import (
 import asyncio
 import uvicorn
 import os
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from compression import CompressionMiddleware, CompressionStats
+from lifecycle import serve
 
 # MCP 서버 생성
 mcp = FastMCP("Streamable DEMO")
 
+# MCP 응답 압축 통계 (/compression-stats 에서 확인)
+compression_stats = CompressionStats()
+
 app = FastAPI()
 
 @app.get("/", response_class=HTMLResponse)
@@ -42,13 +50,22 @@ async def process_files(message: str, ctx: Context) -> TextContent:
     await ctx.info("All files processed!")
     return TextContent(type="text", text=f"Processed files: {', '.join(files)} | Message: {message}")
 
+@mcp.custom_route("/compression-stats", methods=["GET"])
+async def get_compression_stats(request: Request) -> JSONResponse:
+    return JSONResponse(compression_stats.as_dict())
+
 if __name__ == "__main__":
     import sys
     if "mcp" in sys.argv:
         # streamable-http 전송 방식을 사용하는 MCP 서버 실행
         print("streamable-http 전송 방식을 사용하는 MCP 서버를 시작합니다...")
-        # MCP 서버는 /mcp 엔드포인트가 있는 자체 FastAPI 앱을 생성합니다
-        mcp.run(transport="streamable-http")
+        # MCP 서버는 /mcp 엔드포인트가 있는 자체 Starlette 앱을 생성합니다
+        mcp_app = mcp.streamable_http_app()
+        # 클라이언트가 Accept-Encoding으로 허용하면 1KB 이상의 응답을 압축합니다
+        mcp_app.add_middleware(CompressionMiddleware, minimum_size=1024, stats=compression_stats)
+        # /healthz, /readyz 제공, 종료 신호를 받으면 진행 중인 도구 호출을 마친 뒤 종료합니다
+        drain_timeout = float(os.environ.get("DRAIN_TIMEOUT", "20"))
+        serve(mcp_app, host=mcp.settings.host, port=mcp.settings.port, drain_timeout=drain_timeout)
     else:
         # 클래식 HTTP 스트리밍을 위한 FastAPI 서버 실행
         print("클래식 HTTP 스트리밍용 FastAPI 서버를 시작합니다...")
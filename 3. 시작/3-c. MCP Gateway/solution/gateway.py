@@ -0,0 +1,427 @@
+"""여러 MCP 서버를 하나의 streamable-http 엔드포인트로 묶는 게이트웨이.
+
+Copilot Studio는 게이트웨이의 `/mcp` 하나에만 연결하고, 게이트웨이가 뒤쪽(upstream)
+MCP 서버들과의 연결을 유지합니다.
+
+- upstream 연결(stdio / streamable-http)은 시작할 때 한 번 맺고 계속 재사용합니다.
+  대화마다 upstream 연결을 새로 맺는 비용이 없습니다.
+- 도구 이름은 `<upstream>__<도구>`, 리소스 URI는 `<upstream>+<원래 URI>` 형식으로
+  이름 공간을 나눠 카탈로그를 합칩니다.
+- 도구 호출은 해당 도구를 가진 upstream으로 전달되며, 요청마다 별도 태스크에서
+  처리되므로 동시에 들어온 호출은 upstream들로 병렬 전달됩니다.
+
+실행:
+
+    python gateway.py gateway.json
+"""
+
+import asyncio
+import contextlib
+import itertools
+import json
+import logging
+import math
+import os
+import sys
+import weakref
+
+import anyio
+import uvicorn
+from mcp import ClientSession, StdioServerParameters, types
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+from mcp.shared.exceptions import McpError
+from mcp.server.lowlevel import NotificationOptions, Server
+from mcp.server.lowlevel.helper_types import ReadResourceContents
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from starlette.applications import Starlette
+from starlette.routing import Route
+
+# 로깅 설정
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+)
+logger = logging.getLogger("mcp_gateway")
+
+# 도구 이름 구분자 (Copilot Studio/LLM 함수 이름에 '.'을 쓸 수 없어 '__' 사용)
+TOOL_SEPARATOR = "__"
+# 리소스 URI 구분자 (URI 스킴에 허용되는 문자)
+URI_SEPARATOR = "+"
+
+# upstream 연결/상태 확인 기본값 (초, upstream 설정에서 바꿀 수 있음)
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_HEALTH_CHECK_INTERVAL = 15
+PING_TIMEOUT = 5
+MIN_RECONNECT_DELAY = 1
+MAX_RECONNECT_DELAY = 30
+
+
+class UpstreamUnavailable(RuntimeError):
+    """연결이 끊긴(또는 아직 연결되지 않은) upstream으로 요청을 보내려 할 때 발생합니다."""
+
+    def __init__(self, name):
+        super().__init__(f"upstream '{name}' unavailable")
+
+
+def _root_cause(exc):
+    """anyio 태스크 그룹이 감싼 ExceptionGroup에서 실제 원인을 꺼내 한 줄로 만듭니다."""
+    while isinstance(exc, BaseExceptionGroup) and exc.exceptions:
+        exc = exc.exceptions[0]
+    return f"{type(exc).__name__}: {exc}"
+
+
+class Upstream:
+    """하나의 upstream MCP 서버에 대한 세션 풀.
+
+    `pool_size`개의 세션을 유지하고 호출마다 돌아가며 사용합니다. 하나의 세션에서도
+    여러 요청을 동시에 보낼 수 있지만, 요청을 순서대로 처리하는 서버라면 세션을
+    늘려 병렬성을 높일 수 있습니다.
+
+    세션이 끊기면(요청 실패 또는 주기적인 ping 실패) upstream을 중단 상태로 표시하고,
+    백오프 간격으로 다시 연결합니다.
+    """
+
+    def __init__(self, name, config):
+        self.name = name
+        self.config = config
+        self.pool_size = config.get("pool_size", 1)
+        self.connect_timeout = config.get("connect_timeout", DEFAULT_CONNECT_TIMEOUT)
+        self.health_check_interval = config.get("health_check_interval", DEFAULT_HEALTH_CHECK_INTERVAL)
+        self.sessions = []
+        self.ready = asyncio.Event()  # 첫 연결 시도가 끝나면(성공/실패 무관) 설정
+        self._failed = asyncio.Event()
+        self._next = None
+        # upstream이 목록 변경을 알리면 다음 카탈로그 조회 때 다시 가져옴
+        self.stale = True
+        # 카탈로그가 바뀔 때(목록 변경 알림, 연결 끊김/재연결) 호출할 콜백
+        self.on_change = None
+
+    async def serve(self, shutdown):
+        """세션 풀을 열고 `shutdown`이 설정될 때까지 유지합니다.
+
+        stdio/http 클라이언트 컨텍스트는 연 태스크에서 닫아야 하므로 upstream마다
+        전용 태스크에서 실행합니다. 연결에 실패하거나 연결이 끊기면 카탈로그에서
+        빠지고, 백오프 간격(최대 `MAX_RECONNECT_DELAY`초)으로 다시 연결합니다.
+        """
+        delay = MIN_RECONNECT_DELAY
+        failures = 0  # 연속 실패 횟수 (스택 트레이스는 첫 실패에만 출력)
+        while not shutdown.is_set():
+            self._failed = asyncio.Event()
+            try:
+                # 연결 단계에만 제한 시간을 두고, 연결된 뒤에는 해제
+                with anyio.CancelScope(deadline=anyio.current_time() + self.connect_timeout) as scope:
+                    async with contextlib.AsyncExitStack() as stack:
+                        await self._connect(stack)
+                        scope.deadline = math.inf
+                        delay = MIN_RECONNECT_DELAY
+                        failures = 0
+                        self.stale = True
+                        self.ready.set()
+                        self._changed()
+                        await self._watch(shutdown)
+                if scope.cancelled_caught:
+                    logger.warning("upstream '%s' 연결 시간 초과 (%s초)", self.name, self.connect_timeout)
+            except Exception as exc:
+                failures += 1
+                if failures == 1:
+                    logger.exception("upstream '%s' 연결 실패", self.name)
+                else:
+                    logger.warning("upstream '%s' 연결 실패 (%d회째): %s", self.name, failures, _root_cause(exc))
+            finally:
+                connected = bool(self.sessions)
+                self.sessions = []
+                self.ready.set()
+                if connected and not shutdown.is_set():
+                    self._changed()
+            if shutdown.is_set():
+                break
+            logger.info("upstream '%s' %d초 후 다시 연결", self.name, delay)
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(shutdown.wait(), delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    async def _connect(self, stack):
+        # 모든 세션이 초기화된 뒤에 sessions와 _next를 함께 교체 (연결 중인 세션으로 요청이 가지 않도록)
+        sessions = []
+        for _ in range(self.pool_size):
+            if self.config["transport"] == "stdio":
+                params = StdioServerParameters(
+                    command=self.config["command"],
+                    args=self.config.get("args", []),
+                    env=self.config.get("env"),
+                )
+                read, write = await stack.enter_async_context(stdio_client(params))
+            else:
+                read, write, _ = await stack.enter_async_context(
+                    streamablehttp_client(self.config["url"], headers=self.config.get("headers"))
+                )
+            session = await stack.enter_async_context(
+                ClientSession(read, write, message_handler=self._message_handler)
+            )
+            await session.initialize()
+            sessions.append(session)
+        self.sessions, self._next = sessions, itertools.cycle(sessions)
+        logger.info("upstream '%s' 연결 완료 (세션 %d개)", self.name, self.pool_size)
+
+    async def _watch(self, shutdown):
+        """종료되거나 세션이 실패할 때까지 주기적으로 ping을 보내 연결 상태를 확인합니다."""
+        while not shutdown.is_set() and not self._failed.is_set():
+            waiters = [asyncio.ensure_future(shutdown.wait()), asyncio.ensure_future(self._failed.wait())]
+            _, pending = await asyncio.wait(
+                waiters, timeout=self.health_check_interval, return_when=asyncio.FIRST_COMPLETED
+            )
+            for waiter in pending:
+                waiter.cancel()
+            if shutdown.is_set() or self._failed.is_set():
+                return
+            for session in list(self.sessions):
+                try:
+                    with anyio.fail_after(PING_TIMEOUT):
+                        await session.send_ping()
+                except Exception:
+                    logger.warning("upstream '%s' 상태 확인(ping) 실패", self.name)
+                    self.mark_down()
+                    return
+
+    def mark_down(self):
+        """세션 풀을 비우고 `serve`가 다시 연결하도록 알립니다."""
+        if self.sessions:
+            logger.warning("upstream '%s' 연결 끊김: 카탈로그에서 제외합니다", self.name)
+            self.sessions = []
+            self._changed()
+        self._failed.set()
+
+    def _changed(self):
+        if self.on_change is not None:
+            self.on_change()
+
+    async def request(self, method, *args):
+        """세션 하나로 요청을 보냅니다. 연결이 끊겼으면 `UpstreamUnavailable`을 발생시킵니다."""
+        if not self.sessions:
+            raise UpstreamUnavailable(self.name)
+        session = next(self._next)
+        try:
+            return await getattr(session, method)(*args)
+        except (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream):
+            self.mark_down()
+            raise UpstreamUnavailable(self.name) from None
+        except McpError as e:
+            if e.error.code != types.CONNECTION_CLOSED:
+                raise
+            self.mark_down()
+            raise UpstreamUnavailable(self.name) from None
+
+    async def _message_handler(self, message):
+        if isinstance(message, types.ServerNotification) and isinstance(
+            message.root,
+            types.ToolListChangedNotification | types.ResourceListChangedNotification,
+        ):
+            self.stale = True
+            self._changed()
+
+    async def fetch_catalog(self):
+        """upstream의 도구/리소스/리소스 템플릿 목록을 모두(페이지 포함) 가져옵니다."""
+        capabilities = self.sessions[0].get_server_capabilities() if self.sessions else None
+        if capabilities is None:
+            raise UpstreamUnavailable(self.name)
+        self.stale = False
+        tools, resources, templates = [], [], []
+        if capabilities.tools:
+            tools = await self._collect("list_tools", "tools")
+        if capabilities.resources:
+            resources = await self._collect("list_resources", "resources")
+            templates = await self._collect("list_resource_templates", "resourceTemplates")
+        return tools, resources, templates
+
+    async def _collect(self, method, field):
+        """커서를 따라가며 페이지로 나뉜 목록을 모두 모읍니다."""
+        items, cursor = [], None
+        while True:
+            result = await self.request(method, cursor) if cursor else await self.request(method)
+            items.extend(getattr(result, field))
+            cursor = result.nextCursor
+            if not cursor:
+                return items
+
+
+class Gateway:
+    def __init__(self, upstreams):
+        self.upstreams = {name: Upstream(name, config) for name, config in upstreams.items()}
+        self.tools = {}  # 게이트웨이 도구 이름 -> (upstream, 원래 도구 이름, Tool)
+        self.resources = []
+        self.templates = []
+        self._listed = set()  # 카탈로그에 항목이 들어 있는 upstream 이름
+        self._lock = asyncio.Lock()
+        # 목록 변경 알림을 받을 다운스트림(Copilot Studio 등) 세션
+        self.clients = weakref.WeakSet()
+        self._update_task = None
+        for upstream in self.upstreams.values():
+            upstream.on_change = self.catalog_changed
+
+    def catalog_changed(self):
+        """upstream 카탈로그가 바뀌면 다시 합친 뒤 다운스트림 세션에 목록 변경을 알립니다.
+
+        짧은 시간에 여러 번 바뀌어도 진행 중인 갱신이 끝나기 전에는 한 번만 예약합니다.
+        """
+        if self._update_task is None or self._update_task.done():
+            self._update_task = asyncio.get_running_loop().create_task(self._update())
+
+    async def _update(self):
+        await asyncio.sleep(0)  # 같은 틱에 발생한 변경을 모아서 처리
+        await self.refresh()
+        for session in list(self.clients):
+            try:
+                await session.send_tool_list_changed()
+                await session.send_resource_list_changed()
+            except Exception:
+                # 이미 종료된 세션
+                self.clients.discard(session)
+
+    async def refresh(self):
+        """끊긴 upstream의 항목은 빼고, 변경된 upstream의 카탈로그만 병렬로 다시 가져와 합칩니다."""
+        async with self._lock:
+            for upstream in self.upstreams.values():
+                if not upstream.sessions and upstream.name in self._listed:
+                    self._drop(upstream)
+            stale = [u for u in self.upstreams.values() if u.stale and u.sessions]
+            if not stale:
+                return
+            catalogs = await asyncio.gather(*(u.fetch_catalog() for u in stale), return_exceptions=True)
+            for upstream, catalog in zip(stale, catalogs):
+                self._drop(upstream)
+                if isinstance(catalog, BaseException):
+                    logger.warning("upstream '%s' 카탈로그 조회 실패: %s", upstream.name, catalog)
+                    upstream.stale = True
+                    continue
+                tools, resources, templates = catalog
+                prefix = upstream.name + TOOL_SEPARATOR
+                for tool in tools:
+                    name = prefix + tool.name
+                    self.tools[name] = (upstream, tool.name, tool.model_copy(update={"name": name}))
+
+                uri_prefix = upstream.name + URI_SEPARATOR
+                self.resources += [
+                    r.model_copy(update={"uri": uri_prefix + str(r.uri)}) for r in resources
+                ]
+                self.templates += [
+                    t.model_copy(update={"uriTemplate": uri_prefix + t.uriTemplate}) for t in templates
+                ]
+                self._listed.add(upstream.name)
+
+    def _drop(self, upstream):
+        """upstream의 도구/리소스/리소스 템플릿을 카탈로그에서 뺍니다."""
+        prefix = upstream.name + TOOL_SEPARATOR
+        self.tools = {k: v for k, v in self.tools.items() if not k.startswith(prefix)}
+        uri_prefix = upstream.name + URI_SEPARATOR
+        self.resources = [r for r in self.resources if not str(r.uri).startswith(uri_prefix)]
+        self.templates = [t for t in self.templates if not t.uriTemplate.startswith(uri_prefix)]
+        self._listed.discard(upstream.name)
+
+    def route_uri(self, uri):
+        """게이트웨이 리소스 URI를 (upstream, 원래 URI)로 변환합니다."""
+        name, sep, original = str(uri).partition(URI_SEPARATOR)
+        if not sep or name not in self.upstreams:
+            raise ValueError(f"Unknown resource: {uri}")
+        return self.upstreams[name], original
+
+
+class GatewayServer(Server):
+    """카탈로그 변경 알림(`listChanged`)을 지원한다고 알리는 저수준 MCP 서버."""
+
+    def create_initialization_options(self, notification_options=None, experimental_capabilities=None):
+        if notification_options is None:
+            notification_options = NotificationOptions(tools_changed=True, resources_changed=True)
+        return super().create_initialization_options(notification_options, experimental_capabilities)
+
+
+def create_server(gateway):
+    """게이트웨이 카탈로그를 제공하는 저수준 MCP 서버를 만듭니다."""
+    server = GatewayServer("mcp-gateway")
+
+    def track_client():
+        # 목록을 조회한 세션에 이후 카탈로그 변경을 알림
+        gateway.clients.add(server.request_context.session)
+
+    @server.list_tools()
+    async def list_tools() -> list[types.Tool]:
+        track_client()
+        await gateway.refresh()
+        return [tool for _, _, tool in gateway.tools.values()]
+
+    # 입력 검증은 실제 도구를 가진 upstream 서버가 수행
+    @server.call_tool(validate_input=False)
+    async def call_tool(name: str, arguments: dict) -> types.CallToolResult:
+        if name not in gateway.tools:
+            await gateway.refresh()
+        if name not in gateway.tools:
+            upstream = gateway.upstreams.get(name.partition(TOOL_SEPARATOR)[0])
+            if upstream is not None and not upstream.sessions:
+                raise UpstreamUnavailable(upstream.name)
+            raise ValueError(f"Unknown tool: {name}")
+        upstream, original_name, _ = gateway.tools[name]
+        return await upstream.request("call_tool", original_name, arguments)
+
+    @server.list_resources()
+    async def list_resources() -> list[types.Resource]:
+        track_client()
+        await gateway.refresh()
+        return gateway.resources
+
+    @server.list_resource_templates()
+    async def list_resource_templates() -> list[types.ResourceTemplate]:
+        track_client()
+        await gateway.refresh()
+        return gateway.templates
+
+    @server.read_resource()
+    async def read_resource(uri) -> list[ReadResourceContents]:
+        upstream, original_uri = gateway.route_uri(uri)
+        result = await upstream.request("read_resource", original_uri)
+        return [
+            ReadResourceContents(
+                content=c.text if isinstance(c, types.TextResourceContents) else c.blob,
+                mime_type=c.mimeType,
+            )
+            for c in result.contents
+        ]
+
+    return server
+
+
+def create_app(config):
+    gateway = Gateway(config["upstreams"])
+    session_manager = StreamableHTTPSessionManager(app=create_server(gateway))
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        # upstream 연결과 세션 관리자는 게이트웨이 프로세스가 살아 있는 동안 유지
+        shutdown = asyncio.Event()
+        async with anyio.create_task_group() as tg:
+            # 모든 upstream에 동시에 연결 (upstream마다 connect_timeout 안에 첫 시도가 끝남)
+            for upstream in gateway.upstreams.values():
+                tg.start_soon(upstream.serve, shutdown)
+            await asyncio.gather(*(u.ready.wait() for u in gateway.upstreams.values()))
+            await gateway.refresh()
+            logger.info("게이트웨이 도구 %d개: %s", len(gateway.tools), ", ".join(gateway.tools))
+            try:
+                async with session_manager.run():
+                    yield
+            finally:
+                shutdown.set()
+
+    class MCPEndpoint:
+        # 함수가 아닌 ASGI 앱으로 등록해야 Route가 요청을 그대로 넘겨줌 (/mcp/ 리다이렉트 없음)
+        async def __call__(self, scope, receive, send):
+            await session_manager.handle_request(scope, receive, send)
+
+    return Starlette(routes=[Route("/mcp", endpoint=MCPEndpoint())], lifespan=lifespan)
+
+
+if __name__ == "__main__":
+    config_path = sys.argv[1] if len(sys.argv) > 1 else "gateway.json"
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    # 설정 파일의 상대 경로(stdio upstream의 args 등)는 설정 파일 위치 기준
+    os.chdir(os.path.dirname(os.path.abspath(config_path)))
+    uvicorn.run(create_app(config), host=config.get("host", "127.0.0.1"), port=config.get("port", 8000))